@@ -5,50 +5,69 @@ from sklearn.linear_model import LinearRegression, Lasso, Ridge
 from sklearn.model_selection import train_test_split
 import matplotlib.pyplot as plt
 from sklearn.model_selection import GridSearchCV
+from sklearn.preprocessing import StandardScaler
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from utils.preprocess import preprocess
+from utils.preprocess import encode_features
 from utils.evaluation import print_metrics, eval_metrics, plot_residuals
 
 
 
-def train(game_data):
+def fit_models(X_train, y_train):
     """
-        Takes a DataFrame containing game data and builds a linear regression model to predict attendance.
+        Takes training features and outcomes and fits linear, Ridge, and Lasso regression models, tuning the
+        alphas for Ridge and Lasso with GridSearchCV. Returns a dict of the fitted models keyed by name and a dict
+        of the fitted GridSearchCV objects.
     """
-    # split predictors and outcome
-    target = game_data["attendance"]
-    features = game_data.drop(columns=["attendance", "stadium"])
-
-    # preprocess features
-    features = preprocess(features, model="linear")
-
     # create the models
     lin_reg = LinearRegression()
     ridge_reg = Ridge() 
     lasso_reg = Lasso()
 
-    # split the data into train and test
-    X_train, X_test, y_train, y_test = train_test_split(features, target, test_size=0.2, random_state=42)
-    
     # perform GridSearchCV to tune hyperparameters
     ridge_params = {'alpha': [0.1, 1, 10, 100, 200]}
     lasso_params = {'alpha': [0.1, 1, 10, 100, 200]}
     ridge_search = GridSearchCV(ridge_reg, ridge_params, cv=5, scoring='neg_mean_squared_error')
     lasso_search = GridSearchCV(lasso_reg, lasso_params, cv=5, scoring='neg_mean_squared_error')
 
-    # fit models to find best parameters
+    # fit models to find best parameters (GridSearchCV refits the best estimator on all of X_train)
     ridge_search.fit(X_train, y_train)
     lasso_search.fit(X_train, y_train)
-    ridge_best = ridge_search.best_estimator_
-    lasso_best = lasso_search.best_estimator_
-
-    # train all models
-    for model, name in [(lin_reg, "Linear_Regression"), 
-                        (ridge_best, "Ridge_Regression"), 
-                        (lasso_best, "Lasso_Regression")]:
-        # fit the model and make predictions
-        model.fit(X_train, y_train)
+    lin_reg.fit(X_train, y_train)
+
+    models = {"Linear_Regression": lin_reg,
+              "Ridge_Regression": ridge_search.best_estimator_,
+              "Lasso_Regression": lasso_search.best_estimator_}
+    searches = {"Ridge_Regression": ridge_search, "Lasso_Regression": lasso_search}
+
+    return models, searches
+
+
+def train(game_data, plot=True):
+    """
+        Takes a DataFrame containing game data and builds a linear regression model to predict attendance,
+        saving residual and tuning parameter plots to /plots if plot is True. Returns a dict of the fitted models keyed by name, along with the fitted scaler and the encoded
+        feature names so the models can be reused to score new games.
+    """
+    # split predictors and outcome
+    target = game_data["attendance"]
+    features = game_data.drop(columns=["attendance", "stadium"])
+
+    # encode and scale features, keeping the scaler and column names for scoring new games later
+    features = encode_features(features, model="linear")
+    feature_names = list(features.columns)
+    scaler = StandardScaler()
+    features = scaler.fit_transform(features)
+
+    # split the data into train and test
+    X_train, X_test, y_train, y_test = train_test_split(features, target, test_size=0.2, random_state=42)
+
+    # tune and fit the models
+    models, searches = fit_models(X_train, y_train)
+
+    # evaluate all models
+    for name, model in models.items():
+        # make predictions
         y_train_pred = model.predict(X_train)
         y_test_pred = model.predict(X_test)
 
@@ -58,13 +77,16 @@ def train(game_data):
         print_metrics(eval_metrics(y_test, y_test_pred), model_type=name, dataset_type='Test')
         print("\n")
 
+        if not plot:
+            continue
+
         # plot residuals
         plot_residuals(y_test, y_test_pred, model_name=name)
 
         # plotting for the tuning parameters
-        if model == ridge_best or model == lasso_best:
-            params = ridge_params if model == ridge_best else lasso_params
-            cv_results = ridge_search.cv_results_ if model == ridge_best else lasso_search.cv_results_
+        if name in searches:
+            params = searches[name].param_grid
+            cv_results = searches[name].cv_results_
 
             plt.figure(figsize=(10, 6))
             plt.plot(params['alpha'], -cv_results['mean_test_score'], label=f'{name} - MSE')
@@ -75,6 +97,8 @@ def train(game_data):
             plt.xscale('log')
             plt.savefig(f"plots/parameter_plots/{name}_parameters.png", dpi=300, bbox_inches="tight")
 
+    return models, scaler, feature_names
+
 
 def main():
     """
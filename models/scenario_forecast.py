@@ -0,0 +1,232 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.preprocess import encode_features
+from models.linear_regression import train
+
+
+def get_capacities(games):
+    """
+        Takes a DataFrame of upcoming games and returns an array with the capacity of each game's stadium,
+        looked up by team and year in the stadium capacity table.
+    """
+    stadium_df = pd.read_csv("data/stadium_capacity_2000-2024.csv")[["Team", "Year", "Capacity"]]
+    merged = games[["team", "year"]].merge(stadium_df, left_on=["team", "year"], right_on=["Team", "Year"], how="left")
+
+    # fall back to the capacity already on the game rows for team/years missing from the table
+    capacities = merged["Capacity"].fillna(pd.Series(games["capacity"].values)).to_numpy(dtype=float)
+
+    return capacities
+
+
+def draw_weather(history, games, n_scenarios, rng):
+    """
+        Takes a DataFrame of past games, a DataFrame of upcoming games, a number of scenarios and a numpy Generator
+        and draws the weather for every game in every scenario from the historical weather at each team's park.
+        Returns a dict of (scenarios x games) arrays for temp and windspeed, a (scenarios x games) array of indices
+        into the (precip, sky) conditions, and the list of conditions.
+    """
+    weather = {}
+
+    # temp and windspeed are drawn from a normal fit to each team's values in that month,
+    # falling back to the league-wide month
+    for column in ["temp", "windspeed"]:
+        team_month = history.groupby(["team", "month"])[column].agg(["mean", "std"]).reset_index()
+        league_month = history.groupby("month")[column].agg(["mean", "std"]).reset_index()
+        stats = games[["team", "month"]].merge(team_month, on=["team", "month"], how="left")
+        stats = stats.merge(league_month, on="month", how="left", suffixes=("", "_league"))
+        mean = stats["mean"].fillna(stats["mean_league"]).to_numpy(dtype=float)
+        std = stats["std"].fillna(stats["std_league"]).fillna(0).to_numpy(dtype=float)
+        weather[column] = np.maximum(np.round(mean + std * rng.standard_normal((n_scenarios, len(games)))), 0)
+
+    # precip and sky are drawn together from each team's historical frequencies of each (precip, sky) pair,
+    # falling back to the league-wide frequencies, so a scenario can't pair a sunny sky with rain
+    condition_freqs = pd.crosstab(history["team"], [history["precip"], history["sky"]], normalize="index")
+    conditions = list(condition_freqs.columns)
+    league_freqs = history.groupby(["precip", "sky"]).size()
+    league_freqs = (league_freqs / league_freqs.sum()).reindex(conditions, fill_value=0)
+    probs = condition_freqs.reindex(games["team"]).fillna(league_freqs).to_numpy(dtype=float)
+
+    # inverse CDF sampling of every (scenario, game) pair at once
+    cdf = np.cumsum(probs, axis=1)
+    draws = rng.random((n_scenarios, len(games), 1))
+    condition_idx = np.minimum((draws > cdf[np.newaxis, :, :]).sum(axis=2), len(conditions) - 1)
+
+    return weather, condition_idx, conditions
+
+
+def simulate_standings(history, games, n_scenarios, rng, games_per_home_game=2, talent_std=0.05):
+    """
+        Takes a DataFrame of past games, a DataFrame of upcoming games, a number of scenarios and a numpy Generator
+        and simulates each team's results over the rest of the season. Returns a dict of (scenarios x games) arrays
+        of the pre-game win_pct, streak, last_10_win_pct and games_behind for every upcoming game, all derived
+        from the same simulated outcomes. games_behind assumes the division leader plays .500 ball from here on.
+    """
+    standings = {column: np.zeros((n_scenarios, len(games)))
+                 for column in ["win_pct", "streak", "last_10_win_pct", "games_behind"]}
+
+    for team, team_games in games.groupby("team", sort=False):
+        # positions of this team's games in the games frame, in schedule order
+        pos = games.index.get_indexer(team_games.sort_values("date").index)
+        n_home = len(pos)
+
+        # only home games are kept in the data, so approximate the games already played
+        # (and the games played between home dates) with games_per_home_game
+        start = team_games.sort_values("date").iloc[0]
+        prior_home = ((history["team"] == team) & (history["year"] == start["year"])
+                      & (pd.to_datetime(history["date"]) < pd.to_datetime(start["date"]))).sum()
+        played = prior_home * games_per_home_game
+        wins = start["win_pct"] * played
+
+        # each scenario gets its own true talent level around the current winning percentage
+        talent = np.clip(rng.normal(start["win_pct"] if played else 0.5, talent_std, n_scenarios), 0.25, 0.75)
+        outcomes = rng.random((n_scenarios, n_home * games_per_home_game)) < talent[:, np.newaxis]
+
+        # records are pre-game, so the game at step i reflects all outcomes before it
+        cum_wins = np.concatenate([np.zeros((n_scenarios, 1)), np.cumsum(outcomes, axis=1)[:, :-1]], axis=1)
+        steps = np.arange(n_home * games_per_home_game)
+        total = played + steps
+        pct = np.divide(wins + cum_wins, total, out=np.zeros_like(cum_wins), where=total > 0)
+
+        # last 10 games are the simulated games so far, topped up with games before the forecast
+        # at the team's last known last_10_win_pct
+        window_start = np.maximum(steps - 10, 0)
+        window_wins = cum_wins - cum_wins[:, window_start]
+        prior_count = np.minimum(played, np.maximum(10 - steps, 0))
+        window_count = prior_count + np.minimum(steps, 10)
+        last_10 = np.divide(start["last_10_win_pct"] * prior_count + window_wins, window_count,
+                            out=np.zeros_like(cum_wins), where=window_count > 0)
+
+        # each game moves the team half a game closer to a .500 leader for a win and half a game further for a loss
+        games_behind = start["games_behind"] + 0.5 * steps - cum_wins
+
+        # streaks are carried forward one game at a time, vectorized over scenarios
+        streaks = np.empty((n_scenarios, n_home * games_per_home_game))
+        current = np.full(n_scenarios, float(start["streak"]))
+        for i in steps:
+            streaks[:, i] = current
+            won = outcomes[:, i]
+            current = np.where(won, np.where(current > 0, current + 1, 1), np.where(current < 0, current - 1, -1))
+
+        for column, values in [("win_pct", pct), ("streak", streaks),
+                               ("last_10_win_pct", last_10), ("games_behind", games_behind)]:
+            standings[column][:, pos] = values[:, ::games_per_home_game]
+
+    return standings
+
+
+def freeze_results(games, columns=("runs_scored_pg", "runs_allowed_pg", "runs_scored_last_10",
+                                   "runs_allowed_last_10", "division_rank", "cLI")):
+    """
+        Takes a DataFrame of upcoming games and returns a copy with the given results columns set, for every game,
+        to the team's value going into its first upcoming game (the last value known at the forecast start).
+    """
+    games = games.copy()
+    columns = [column for column in columns if column in games.columns]
+    games[columns] = games.sort_values("date").groupby("team")[columns].transform("first")
+
+    return games
+
+
+def build_scenario_tensor(games, feature_names, weather, condition_idx, conditions, standings, dtype=np.float32):
+    """
+        Takes a DataFrame of upcoming games, the encoded feature names of a trained model, and the scenario draws
+        and returns a (scenarios x games x features) array of unscaled features. No observed values from the
+        upcoming games themselves are used for anything but the schedule:
+          - simulated: win_pct, streak, last_10_win_pct, games_behind (from simulate_standings)
+          - drawn: temp, windspeed, and precip and sky together (from draw_weather)
+          - frozen at the forecast start: runs_scored_pg, runs_allowed_pg, runs_scored_last_10,
+            runs_allowed_last_10, division_rank, cLI (from freeze_results)
+    """
+    # encode the games the same way as the training data, aligning to the training columns
+    base = freeze_results(games).drop(columns=["attendance", "stadium"], errors="ignore")
+    base = encode_features(base, model="linear").reindex(columns=feature_names, fill_value=0)
+    base = base.to_numpy(dtype=dtype)
+
+    n_scenarios = condition_idx.shape[0]
+    tensor = np.broadcast_to(base, (n_scenarios,) + base.shape).copy()
+
+    # overwrite the simulated and drawn numeric columns
+    for column, values in {**weather, **standings}.items():
+        if column in feature_names:
+            tensor[:, :, feature_names.index(column)] = values
+
+    # replace the precip and sky one-hot columns, mapping each drawn condition onto the columns the model knows
+    onehot = (condition_idx[:, :, np.newaxis] == np.arange(len(conditions))).astype(dtype)
+    for k, column in enumerate(["precip", "sky"]):
+        cols = [i for i, name in enumerate(feature_names) if name.startswith(f"{column}_")]
+        mapping = np.array([[feature_names[i] == f"{column}_{condition[k]}" for i in cols] for condition in conditions],
+                           dtype=dtype)
+        tensor[:, :, cols] = onehot @ mapping
+
+    return tensor
+
+
+def score_scenarios(tensor, model, scaler, capacities):
+    """
+        Takes a (scenarios x games x features) array, a fitted linear model and its scaler, and the capacity
+        of each game's stadium and returns a (scenarios x games) array of predicted attendance.
+    """
+    # fold the scaler into the coefficients so the raw tensor can be scored with a single matrix product
+    weights = model.coef_ / scaler.scale_
+    intercept = model.intercept_ - scaler.mean_ @ weights
+
+    preds = tensor @ weights.astype(tensor.dtype) + intercept
+
+    # attendance can't be negative or exceed the stadium's capacity
+    return np.clip(preds, 0, capacities[np.newaxis, :])
+
+
+def forecast(history, games, model, scaler, feature_names, n_scenarios=200, quantiles=(0.05, 0.5, 0.95), seed=42):
+    """
+        Takes a DataFrame of past games, a DataFrame of upcoming games, a fitted linear model with its scaler
+        and feature names, and returns a DataFrame with attendance quantiles for each upcoming game across
+        weather and standings scenarios.
+    """
+    games = games.reset_index(drop=True)
+    rng = np.random.default_rng(seed)
+
+    # draw the scenarios and score them all at once
+    weather, condition_idx, conditions = draw_weather(history, games, n_scenarios, rng)
+    standings = simulate_standings(history, games, n_scenarios, rng)
+    tensor = build_scenario_tensor(games, feature_names, weather, condition_idx, conditions, standings)
+    capacities = get_capacities(games)
+    preds = score_scenarios(tensor, model, scaler, capacities)
+
+    # summarize the predictions for each game
+    results = games[["date", "team", "opponent"]].copy()
+    results["capacity"] = capacities
+    results["mean"] = preds.mean(axis=0)
+    labels = [f"q{q * 100:g}" for q in quantiles]
+    if len(set(labels)) != len(labels):
+        raise ValueError(f"Quantiles give duplicate column names: {labels}")
+    for label, values in zip(labels, np.quantile(preds, quantiles, axis=0)):
+        results[label] = values
+
+    return results
+
+
+def main():
+    """
+        Trains linear models on past seasons and forecasts attendance for the rest of the latest season
+        (August on) across weather and standings scenarios.
+    """
+    game_data = pd.read_csv("data/MLB_games_2000-2024.csv")
+
+    # treat the final two months of the latest season as the remaining schedule
+    remaining = (game_data["year"] == game_data["year"].max()) & (game_data["month"] >= 8)
+    history = game_data[~remaining].reset_index(drop=True)
+    games = game_data[remaining].reset_index(drop=True)
+
+    # skip the plots so the saved results for the full dataset aren't overwritten
+    models, scaler, feature_names = train(history, plot=False)
+    results = forecast(history, games, models["Ridge_Regression"], scaler, feature_names)
+
+    results.to_csv("data/scenario_forecast.csv", index=False, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import sys
+import os
+import tempfile
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.preprocess import encode_features
+from utils.evaluation import print_metrics, eval_metrics
+from models.linear_regression import fit_models
+
+
+def train_shard(key, rows, features_path, target_path, limit_threads=True):
+    """
+        Takes a key identifying the shard, the row indices of the shard, and the paths to the saved feature and
+        target arrays and fits the linear models on that shard. Returns the key, a dict of the fitted models, and
+        the test outcomes and predictions of each model.
+    """
+    # memory-map the shared arrays so only this shard's rows are read into the worker
+    features = np.load(features_path, mmap_mode="r")
+    target = np.load(target_path, mmap_mode="r")
+    X, y = features[rows], target[rows]
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    # parallelism comes from the process pool, so keep each worker to a single BLAS thread
+    with threadpool_limits(limits=1 if limit_threads else None):
+        models, _ = fit_models(X_train, y_train)
+        test_preds = {name: model.predict(X_test) for name, model in models.items()}
+
+    return key, models, y_test, test_preds
+
+
+def train_sharded(game_data, shard_by="team", max_workers=None, min_rows=50):
+    """
+        Takes a DataFrame containing game data and a column to shard on ("team" or "stadium") and trains a separate
+        set of linear models for each value of that column, spreading the shards across a process pool
+        (or training them in this process when max_workers is 1).
+        Values with fewer than min_rows games are pooled into one fallback shard, which is skipped if it is
+        still too small. Returns a dict of the fitted models for each shard value, along with the fitted scaler
+        and the encoded feature names.
+    """
+    # split predictors and outcome, keeping the shard keys before the stadium column is dropped
+    keys = game_data[shard_by].to_numpy()
+    target = game_data["attendance"].to_numpy(dtype=float)
+    features = game_data.drop(columns=["attendance", "stadium"])
+
+    # encode and scale all games together so every shard shares the same feature space
+    features = encode_features(features, model="linear")
+    feature_names = list(features.columns)
+    scaler = StandardScaler()
+    features = scaler.fit_transform(features)
+
+    # each job is the list of shard values it covers; values too small to split and cross-validate
+    # on their own share a fallback shard
+    counts = pd.Series(keys).value_counts(sort=False)
+    jobs = [[key] for key in counts.index if counts[key] >= min_rows]
+    small = [key for key in counts.index if counts[key] < min_rows]
+    if small:
+        if counts[small].sum() >= min_rows:
+            warnings.warn(f"{shard_by} values with fewer than {min_rows} games pooled into a fallback shard: {small}")
+            jobs.append(small)
+        else:
+            warnings.warn(f"{shard_by} values with fewer than {min_rows} games skipped, too few to pool: {small}")
+    if not jobs:
+        raise ValueError(f"No {shard_by} shard has at least {min_rows} games")
+
+    shards = {}
+    y_test_all = []
+    preds_all = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # save the shared arrays once so workers can memory-map them instead of receiving pickled copies
+        features_path = os.path.join(tmp_dir, "features.npy")
+        target_path = os.path.join(tmp_dir, "target.npy")
+        np.save(features_path, features)
+        np.save(target_path, target)
+
+        shard_args = [(i, np.flatnonzero(np.isin(keys, members)), features_path, target_path)
+                      for i, members in enumerate(jobs)]
+
+        # with a single worker, skip the pool and its process startup overhead
+        if max_workers == 1:
+            results = [train_shard(*args, limit_threads=False) for args in shard_args]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(train_shard, *zip(*shard_args)))
+
+    for i, models, y_test, test_preds in results:
+        for key in jobs[i]:
+            shards[key] = models
+        y_test_all.append(y_test)
+        for name, preds in test_preds.items():
+            preds_all.setdefault(name, []).append(preds)
+
+    # calculate and print metrics over the pooled test sets of all the shards
+    y_test_all = np.concatenate(y_test_all)
+    for name, preds in preds_all.items():
+        print_metrics(eval_metrics(y_test_all, np.concatenate(preds)), model_type=f"Sharded_{name}", dataset_type="Test")
+        print("\n")
+
+    return shards, scaler, feature_names
+
+
+def predict_sharded(shards, scaler, feature_names, game_data, shard_by="team", model_name="Ridge_Regression"):
+    """
+        Takes the sharded models, scaler, and feature names returned by train_sharded and a DataFrame of games
+        and returns an array of predicted attendance, routing each game to the model for its shard.
+    """
+    keys = game_data[shard_by].to_numpy()
+    missing = set(pd.unique(keys)) - set(shards)
+    if missing:
+        raise ValueError(f"No shard trained for {shard_by} values: {sorted(missing)}")
+
+    # encode the games the same way as the training data, aligning to the training columns
+    features = game_data.drop(columns=["attendance", "stadium"], errors="ignore")
+    features = encode_features(features, model="linear").reindex(columns=feature_names, fill_value=0)
+    features = scaler.transform(features)
+
+    # dispatch each shard's rows to its model in one batch
+    preds = np.empty(len(game_data))
+    for key in pd.unique(keys):
+        rows = np.flatnonzero(keys == key)
+        preds[rows] = shards[key][model_name].predict(features[rows])
+
+    return preds
+
+
+def main():
+    """
+        Performs preprocessing and training for linear models sharded by team.
+    """
+    game_data = pd.read_csv("data/MLB_games_2000-2024.csv")
+    train_sharded(game_data, shard_by="team")
+
+
+if __name__ == "__main__":
+    main()
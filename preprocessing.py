@@ -1,3 +1,4 @@
+import json
 import pandas as pd
 
 
@@ -103,38 +104,93 @@ def merge_data():
 
     return merged_df
 
-def print_data_info(df):
+def profile_data(df):
     """
-        Takes a DataFrame containing the merged game data and prints some summary information.
+        Takes a DataFrame containing the merged game data and returns a dict of summary statistics
+        (shape, duplicate rows and keys, nulls, categorical frequencies, out-of-range values). Duplicates are counted
+        by hashing the rows, and the rest is gathered in one loop over the columns, without building deduplicated
+        or filtered copies of the frame.
     """
-    print("DF Shape:", df.shape)
-    print()
-    print("DF Shape after dropping duplicates:", df.drop_duplicates().shape)
-    print()
-    print("Number of missing attendance values:", df[df.attendance.isnull()].shape)
-    print()
-    print("Column types:")
-    print(df.dtypes)
-    print()
-    print("Number of double header games with attendance data:", df[((df.attendance.notnull()) & (df.dh == 1))].shape)
-    print()
-    print("Number of nulls for each column:")
-    print(df.isnull().sum())
-    print()
-    print("precip value counts:")
-    print(df["precip"].value_counts(dropna=False))
-    print()
-    print("sky value counts:")
-    print(df["sky"].value_counts(dropna=False))
-    print()
-    print("Rows with missing cLI:")
-    print(df[df["cLI"].isnull()])
-    print()
-    print("Rows with missing weather data:")
-    print(df[df["temp"].isnull()])
-    print()
-    print("Rows with missing windspeed:")
-    print(df[df["windspeed"] == -1])
+    categorical_columns = ["precip", "sky"]
+    # columns identifying a game (number separates double headers, and is dropped by cleaning)
+    key_columns = ["date", "team", "number"]
+    # values used in the raw data to mean "missing" (windspeed) or entered by mistake (temp)
+    sentinels = {"windspeed": -1, "temp": 0}
+
+    # hash each row once so duplicates can be counted without building a deduplicated copy
+    row_hashes = pd.util.hash_pandas_object(df, index=False)
+
+    profile = {
+        "rows": int(df.shape[0]),
+        "columns": int(df.shape[1]),
+        "duplicate_rows": int(row_hashes.duplicated().sum()),
+        "duplicate_keys": None,
+        "dtypes": {},
+        "nulls": {},
+        "value_counts": {},
+        "sentinels": {},
+    }
+
+    # only count duplicate keys when the full key is present, since (date, team) alone repeats for double headers
+    if all(column in df.columns for column in key_columns):
+        key_hashes = pd.util.hash_pandas_object(df[key_columns], index=False)
+        profile["duplicate_keys"] = int(key_hashes.duplicated().sum())
+
+    for column in df.columns:
+        values = df[column]
+        nulls = values.isnull()
+
+        profile["dtypes"][column] = str(values.dtype)
+        profile["nulls"][column] = int(nulls.sum())
+
+        if column in categorical_columns:
+            counts = values.value_counts(dropna=False)
+            profile["value_counts"][column] = {str(value): int(count) for value, count in counts.items()}
+
+        if column in sentinels:
+            profile["sentinels"][f"{column} == {sentinels[column]}"] = int((values == sentinels[column]).sum())
+
+        if column == "attendance":
+            attendance_nulls = nulls
+
+    # double header games with attendance data
+    if "attendance" in df.columns and "dh" in df.columns:
+        profile["dh_with_attendance"] = int(((~attendance_nulls) & (df["dh"] == 1)).sum())
+
+    return profile
+
+
+def save_profile(profile, path):
+    """
+        Takes a data profile dict and saves it as a JSON report to the given path.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+
+
+def diff_profiles(pre, post):
+    """
+        Takes two data profile dicts (e.g. pre- and post-cleaning) and returns a dict of the statistics that changed,
+        mapping each to its [before, after] values.
+    """
+    diff = {}
+
+    # stats that couldn't be computed on one side (None) aren't comparable, so they're left out
+    for key in ["rows", "columns", "duplicate_rows", "duplicate_keys", "dh_with_attendance"]:
+        if pre.get(key) is not None and post.get(key) is not None and pre.get(key) != post.get(key):
+            diff[key] = [pre.get(key), post.get(key)]
+
+    # nested stats are compared entry by entry, with None for entries only present on one side
+    for key in ["dtypes", "nulls", "value_counts", "sentinels"]:
+        entries = {}
+        for name in list(pre[key]) + [name for name in post[key] if name not in pre[key]]:
+            before, after = pre[key].get(name), post[key].get(name)
+            if before != after:
+                entries[name] = [before, after]
+        if entries:
+            diff[key] = entries
+
+    return diff
 
 
 def clean_data(df):
@@ -225,16 +281,20 @@ def main():
     # merge all game, weather, and stadium data
     games_df = merge_data()
 
-    # get some info about the rows in the data, to be addressed in cleaning
-    print("PRE-CLEANING")
-    print_data_info(games_df)
+    # profile the data to find issues to be addressed in cleaning
+    pre_profile = profile_data(games_df)
+    save_profile(pre_profile, "data/profile_pre_cleaning.json")
 
     # clean the data
     games_df = clean_data(games_df)
 
-    # check the data info after cleaning
-    print("POST-CLEANING")
-    print_data_info(games_df)
+    # profile the data after cleaning and report what changed
+    post_profile = profile_data(games_df)
+    save_profile(post_profile, "data/profile_post_cleaning.json")
+    profile_diff = diff_profiles(pre_profile, post_profile)
+    save_profile(profile_diff, "data/profile_diff.json")
+    print("PROFILE CHANGES AFTER CLEANING:")
+    print(json.dumps(profile_diff, indent=2))
 
     # save the cleaned data to a CSV file
     games_df.to_csv("data/MLB_games_2000-2024.csv", index=False, encoding="utf-8")
@@ -3,10 +3,10 @@ import numpy as np
 from sklearn.preprocessing import StandardScaler
 
 
-def preprocess(game_data, model):
+def encode_features(game_data, model):
     """
-        Takes a DataFrame containing game data and a string and performs encoding and scaling of the data,
-        returning the processed DataFrame.
+        Takes a DataFrame containing game data and a string and performs encoding of the data,
+        returning the encoded (but unscaled) DataFrame.
     """
     # drop unnecessary columns
     game_data.drop(columns=["day_of_week_name", "date"], inplace=True)
@@ -22,7 +22,17 @@ def preprocess(game_data, model):
         game_data["month_sin"] = np.sin(2 * np.pi * game_data["month"] / 12)
         game_data["month_cos"] = np.cos(2 * np.pi * game_data["month"] / 12)
 
+    return game_data
+
+
+def preprocess(game_data, model):
+    """
+        Takes a DataFrame containing game data and a string and performs encoding and scaling of the data,
+        returning the processed DataFrame.
+    """
+    game_data = encode_features(game_data, model)
+
     scaler = StandardScaler()
     game_data = scaler.fit_transform(game_data)
 
-    return game_data
\ No newline at end of file
+    return game_data